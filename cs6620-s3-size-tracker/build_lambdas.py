@@ -0,0 +1,185 @@
+# build_lambdas.py
+"""
+Build one deployment zip per lambda into dist/, keeping each artifact as small
+as possible to cut cold-start time:
+  - only the modules a handler needs (boto3 is provided by the Lambda runtime)
+  - plotting deps installed into the function zip instead of the shared layer
+  - tests, __pycache__, headers/stubs, unused matplotlib backends, fonts,
+    toolbar images and sample data stripped
+  - sources precompiled to .pyc (unchecked-hash, so the read-only Lambda
+    filesystem never needs to recompile them)
+
+Usage:
+  python build_lambdas.py                  # build all three
+  python build_lambdas.py plotting         # build one
+  python build_lambdas.py --no-matplotlib  # plotting uses png_line fallback
+Then run report_artifacts.py for sizes and import times.
+"""
+
+import argparse
+import compileall
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(HERE, "build")
+DIST_DIR = os.path.join(HERE, "dist")
+
+# name -> handler module, extra local modules, requirements file (or None)
+FUNCTIONS = {
+    "size_tracking": {
+        "handler": "size_tracking_lambda",
+        "modules": ["size_stats"],
+        "requirements": None,
+    },
+    "plotting": {
+        "handler": "plotting_lambda",
+        "modules": ["png_line", "snapshot"],
+        "requirements": "requirements.txt",
+    },
+    "driver": {
+        "handler": "driver_lambda",
+        "modules": [],
+        "requirements": None,
+    },
+}
+
+STRIP_DIRS = {"__pycache__", "tests", "test"}
+STRIP_SUFFIXES = (".pyi", ".pxd", ".pyx", ".c", ".h", ".cpp")
+
+# everything else under matplotlib/backends is an interactive/vector backend
+KEEP_MPL_BACKENDS = ("__init__", "backend_agg", "_backend_agg", "registry")
+# DejaVuSans is matplotlib's default font; drop the rest of mpl-data/fonts
+KEEP_MPL_FONTS = ("DejaVuSans.ttf",)
+# toolbar icons and example datasets are only used by interactive backends/docs
+STRIP_MPL_DATA = ("images", "sample_data")
+
+def run_pip(requirements, target, python_version, platform):
+    cmd = [
+        sys.executable, "-m", "pip", "install", "--quiet", "--no-cache-dir",
+        "-r", requirements, "-t", target,
+        "--only-binary=:all:", "--platform", platform,
+        "--python-version", python_version, "--implementation", "cp",
+    ]
+    print("Installing", requirements, "->", target)
+    subprocess.check_call(cmd)
+
+def strip_tree(root):
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(root, topdown=True):
+        for d in list(dirnames):
+            if d in STRIP_DIRS:
+                removed += tree_size(os.path.join(dirpath, d))
+                shutil.rmtree(os.path.join(dirpath, d))
+                dirnames.remove(d)
+        for f in filenames:
+            if f.endswith(STRIP_SUFFIXES):
+                path = os.path.join(dirpath, f)
+                removed += os.path.getsize(path)
+                os.remove(path)
+    return removed + strip_matplotlib(root)
+
+def strip_matplotlib(root):
+    removed = 0
+    backends = os.path.join(root, "matplotlib", "backends")
+    if os.path.isdir(backends):
+        for name in os.listdir(backends):
+            path = os.path.join(backends, name)
+            if name.split(".")[0] in KEEP_MPL_BACKENDS:
+                continue
+            removed += tree_size(path)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+    for name in STRIP_MPL_DATA:
+        path = os.path.join(root, "matplotlib", "mpl-data", name)
+        if os.path.isdir(path):
+            removed += tree_size(path)
+            shutil.rmtree(path)
+    fonts = os.path.join(root, "matplotlib", "mpl-data", "fonts")
+    if os.path.isdir(fonts):
+        for dirpath, _, filenames in os.walk(fonts):
+            for f in filenames:
+                if f not in KEEP_MPL_FONTS:
+                    path = os.path.join(dirpath, f)
+                    removed += os.path.getsize(path)
+                    os.remove(path)
+    return removed
+
+def tree_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for f in filenames:
+            total += os.path.getsize(os.path.join(dirpath, f))
+    return total
+
+def precompile(root, python_version):
+    running = "%d.%d" % sys.version_info[:2]
+    if running != python_version:
+        # .pyc files are tied to the interpreter version; mismatched ones are ignored
+        print(f"Skipping precompile: running Python {running}, target {python_version}")
+        return
+    compileall.compile_dir(
+        root, quiet=1, workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+def write_zip(root, out_path):
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for f in sorted(filenames):
+                path = os.path.join(dirpath, f)
+                zf.write(path, os.path.relpath(path, root))
+    return os.path.getsize(out_path)
+
+def build(name, with_matplotlib=True, python_version="3.11",
+          platform="manylinux2014_x86_64"):
+    spec = FUNCTIONS[name]
+    staging = os.path.join(BUILD_DIR, name)
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for module in [spec["handler"]] + spec["modules"]:
+        shutil.copy2(os.path.join(HERE, module + ".py"), staging)
+    if spec["requirements"] and with_matplotlib:
+        run_pip(os.path.join(HERE, spec["requirements"]), staging, python_version, platform)
+
+    removed = strip_tree(staging)
+    precompile(staging, python_version)
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    out_path = os.path.join(DIST_DIR, name + ".zip")
+    size = write_zip(staging, out_path)
+    print(f"Built {out_path}: {size} bytes (stripped {removed} bytes)")
+    return out_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-function lambda zips")
+    parser.add_argument("functions", nargs="*",
+                        help="functions to build: %s (default: all)" % ", ".join(sorted(FUNCTIONS)))
+    parser.add_argument("--no-matplotlib", action="store_true",
+                        help="package plotting without matplotlib (png_line fallback)")
+    parser.add_argument("--python-version", default="3.11",
+                        help="Lambda runtime Python version (default: 3.11)")
+    parser.add_argument("--platform", default="manylinux2014_x86_64",
+                        help="wheel platform tag for dependencies")
+    args = parser.parse_args()
+    unknown = set(args.functions) - set(FUNCTIONS)
+    if unknown:
+        parser.error("unknown function(s): " + ", ".join(sorted(unknown)))
+    for name in args.functions or sorted(FUNCTIONS):
+        build(name, with_matplotlib=not args.no_matplotlib,
+              python_version=args.python_version, platform=args.platform)
+
+if __name__ == "__main__":
+    main()
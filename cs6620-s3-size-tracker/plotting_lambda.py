@@ -1,18 +1,30 @@
 # plotting_lambda.py
 import os
 import io
+import math
 import time
 import boto3
 import traceback
+import json
 from boto3.dynamodb.conditions import Key
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ModuleNotFoundError as e:
+    # slim artifact (build_lambdas.py --no-matplotlib): fall back to png_line.
+    # Anything else (e.g. a file stripped from a packaged matplotlib) must fail.
+    if e.name != "matplotlib":
+        raise
+    plt = None
+    import png_line
 
 REGION = os.environ.get("AWS_REGION", "us-east-1")
 TABLE_NAME = os.environ.get("DDB_TABLE", "S3-object-size-history")
 BUCKET = os.environ.get("BUCKET", "testbucket-mandar-cs6620")
 GSI_NAME = os.environ.get("GSI_NAME", "bucket_size_index")
+# replay only reads snapshots under this S3 prefix
+SNAPSHOT_PREFIX = os.environ.get("SNAPSHOT_PREFIX", f"s3://{BUCKET}/snapshots/")
 
 dynamodb = boto3.resource("dynamodb", region_name=REGION)
 s3 = boto3.client("s3", region_name=REGION)
@@ -29,7 +41,9 @@ def query_last_10_seconds(bucket):
     # convert DynamoDB Decimal -> float/int
     xs = [float(item['ts']) / 1000.0 for item in items]
     ys = [float(item['size']) for item in items]
-    return xs, ys
+    # set by size_tracking_lambda's streaming stats; absent on older rows
+    flags = [bool(item.get('anomaly', False)) for item in items]
+    return xs, ys, flags
 
 def query_max_size(bucket):
     resp = table.query(
@@ -43,16 +57,22 @@ def query_max_size(bucket):
         return float(items[0].get('size', 0))
     return 0.0
 
-def make_plot(xs, ys, max_size, bucket):
+def make_plot(xs, ys, max_size, bucket, window_label="last 10s", flags=None):
+    if plt is None:
+        return png_line.render_line_png(xs, ys, hline=max_size, flags=flags)
     plt.figure(figsize=(8,4))
     if xs and ys:
         plt.plot(xs, ys, marker='o', linestyle='-')
+        if flags and any(flags):
+            ax = [x for x, f in zip(xs, flags) if f]
+            ay = [y for y, f in zip(ys, flags) if f]
+            plt.scatter(ax, ay, marker='x', s=80, color='red', zorder=3, label='Anomalous jump')
     else:
         # empty plot placeholder
         plt.plot([],[])
-        plt.text(0.5, 0.5, "No data in last 10s", horizontalalignment='center', transform=plt.gca().transAxes)
+        plt.text(0.5, 0.5, f"No data in {window_label}", horizontalalignment='center', transform=plt.gca().transAxes)
     plt.axhline(y=max_size, linestyle='--', label=f'Historical high = {int(max_size)} bytes')
-    plt.title(f"Bucket size changes (last 10s) for {bucket}")
+    plt.title(f"Bucket size changes ({window_label}) for {bucket}")
     plt.xlabel("timestamp (s)")
     plt.ylabel("size (bytes)")
     plt.legend()
@@ -63,6 +83,37 @@ def make_plot(xs, ys, max_size, bucket):
     buf.seek(0)
     return buf
 
+def parse_snapshot_params(qs):
+    """
+    Validate the replay query params; raises ValueError (-> 400) unless the
+    snapshot is an s3:// URI under SNAPSHOT_PREFIX and start/end are finite numbers.
+    """
+    source = qs['snapshot']
+    if not (SNAPSHOT_PREFIX.startswith("s3://") and source.startswith(SNAPSHOT_PREFIX)
+            and len(source) > len(SNAPSHOT_PREFIX)):
+        raise ValueError(f"snapshot must be an S3 URI under {SNAPSHOT_PREFIX}")
+    bounds = []
+    for name in ('start', 'end'):
+        value = qs.get(name)
+        if value in (None, ''):
+            bounds.append(None)
+            continue
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be epoch seconds") from None
+        if not math.isfinite(value):
+            raise ValueError(f"{name} must be epoch seconds")
+        bounds.append(value)
+    return source, bounds[0], bounds[1]
+
+def bad_request(message):
+    return {
+        "statusCode": 400,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"error": message})
+    }
+
 def upload_plot(buf, bucket, key):
     s3.upload_fileobj(buf, bucket, key)
     return {"bucket": bucket, "key": key}
@@ -71,6 +122,10 @@ def lambda_handler(event, context):
     """
     HTTP-triggered (API Gateway). Optional query param: ?bucket=<bucket-name>
     Produces a PNG plot and uploads to S3 as plot-<ts>.png, returns a presigned URL.
+    Replay mode: ?snapshot=<s3 URI under SNAPSHOT_PREFIX>[&start=<epoch s>][&end=<epoch s>]
+    renders the window from an exported snapshot (see snapshot.py) with no
+    DynamoDB reads; end defaults to the last snapshot row, start to end - 10s.
+    Any other snapshot source or a non-numeric start/end gets a 400.
     """
     try:
         bucket = BUCKET
@@ -78,9 +133,26 @@ def lambda_handler(event, context):
         qs = event.get('queryStringParameters') or {}
         if qs and qs.get('bucket'):
             bucket = qs.get('bucket')
-        xs, ys = query_last_10_seconds(bucket)
-        max_size = query_max_size(bucket)
-        buf = make_plot(xs, ys, max_size, bucket)
+        if qs.get('snapshot'):
+            try:
+                source, start, end = parse_snapshot_params(qs)
+            except ValueError as e:
+                return bad_request(str(e))
+            # imported here so live-plot cold starts don't pay for it
+            import snapshot
+            try:
+                xs, ys, flags, max_size, source_bucket = snapshot.load_window(source, start, end)
+            except Exception as e:
+                # details stay in the logs; the query string is unauthenticated
+                print("Error reading snapshot:", source, e)
+                traceback.print_exc()
+                return {"statusCode": 500, "body": "snapshot could not be read"}
+            label = "snapshot, last 10s" if start is None and end is None else "snapshot window"
+            buf = make_plot(xs, ys, max_size, source_bucket, window_label=label, flags=flags)
+        else:
+            xs, ys, flags = query_last_10_seconds(bucket)
+            max_size = query_max_size(bucket)
+            buf = make_plot(xs, ys, max_size, bucket, flags=flags)
         ts = int(time.time())
         key = f"plot-{ts}.png"
         upload_plot(buf, bucket, key)
@@ -0,0 +1,117 @@
+# png_line.py
+"""
+Minimal PNG line-chart renderer used by plotting_lambda when matplotlib is not
+packaged. Pure stdlib (zlib + struct), so the plotting artifact can ship
+without the matplotlib/numpy/pillow dependencies.
+Draws axes, a polyline with point markers, optional anomaly crosses and an
+optional dashed horizontal line. No text is rendered (that would need fonts).
+"""
+
+import io
+import struct
+import zlib
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREY = (200, 200, 200)
+BLUE = (31, 119, 180)
+ORANGE = (255, 127, 14)
+RED = (214, 39, 40)
+
+MARGIN = 40
+
+class Canvas:
+    def __init__(self, width, height, bg=WHITE):
+        self.width = width
+        self.height = height
+        self.rows = [bytearray(bytes(bg) * width) for _ in range(height)]
+
+    def set(self, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = x * 3
+            self.rows[y][i:i + 3] = bytes(color)
+
+    def line(self, x0, y0, x1, y1, color, dash=0):
+        # Bresenham; dash > 0 draws dash-length on/off segments
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        step = 0
+        while True:
+            if not dash or (step // dash) % 2 == 0:
+                self.set(x0, y0, color)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+            step += 1
+
+    def square(self, cx, cy, r, color):
+        for y in range(cy - r, cy + r + 1):
+            for x in range(cx - r, cx + r + 1):
+                self.set(x, y, color)
+
+    def cross(self, cx, cy, r, color):
+        for d in range(-r, r + 1):
+            for w in (0, 1):
+                self.set(cx + d + w, cy + d, color)
+                self.set(cx + d + w, cy - d, color)
+
+    def to_png(self):
+        raw = b"".join(b"\x00" + bytes(row) for row in self.rows)
+        def chunk(tag, data):
+            body = tag + data
+            return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+def _scale(lo, hi, out_lo, out_hi):
+    if hi == lo:
+        mid = (out_lo + out_hi) // 2
+        return lambda v: mid
+    k = (out_hi - out_lo) / (hi - lo)
+    return lambda v: int(round(out_lo + (v - lo) * k))
+
+def render_line_png(xs, ys, hline=None, width=800, height=400, flags=None):
+    """
+    Render ys against xs (plus an optional dashed horizontal line at hline,
+    and red crosses on points whose flags entry is true) and return a BytesIO
+    positioned at the start of the PNG data.
+    """
+    c = Canvas(width, height)
+    left, right = MARGIN, width - MARGIN
+    top, bottom = MARGIN, height - MARGIN
+    c.line(left, bottom, right, bottom, BLACK)
+    c.line(left, top, left, bottom, BLACK)
+    c.line(left, top, right, top, GREY)
+    c.line(right, top, right, bottom, GREY)
+
+    y_values = list(ys) + ([hline] if hline is not None else [])
+    if y_values:
+        y_lo, y_hi = min(0.0, min(y_values)), max(y_values)
+        # leave headroom so the top point/line is not drawn on the frame
+        y_hi += (y_hi - y_lo) * 0.05 or 1.0
+        sy = _scale(y_lo, y_hi, bottom, top)
+        if xs:
+            sx = _scale(min(xs), max(xs), left + 10, right - 10)
+            points = [(sx(x), sy(y)) for x, y in zip(xs, ys)]
+            for (x0, y0), (x1, y1) in zip(points, points[1:]):
+                c.line(x0, y0, x1, y1, BLUE)
+            for x, y in points:
+                c.square(x, y, 2, BLUE)
+            for (x, y), flagged in zip(points, flags or []):
+                if flagged:
+                    c.cross(x, y, 6, RED)
+        if hline is not None:
+            c.line(left + 1, sy(hline), right - 1, sy(hline), ORANGE, dash=6)
+
+    buf = io.BytesIO(c.to_png())
+    buf.seek(0)
+    return buf
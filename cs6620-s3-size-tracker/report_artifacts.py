@@ -0,0 +1,122 @@
+# report_artifacts.py
+"""
+Report artifact size and measured handler import time for the zips produced
+by build_lambdas.py. Each zip is extracted to a temp dir and the handler
+module is imported in a fresh, isolated interpreter (-I -S, cwd = the
+extracted artifact, empty MPLCONFIGDIR) several times; the median is
+reported. Only the artifact and the packages the Lambda runtime itself
+provides (boto3 and its deps, linked from the host or taken from
+--runtime-path) are importable, so a module missing from the zip fails
+here the same way it would in Lambda.
+
+Usage:
+  python report_artifacts.py            # all artifacts in dist/
+  python report_artifacts.py --runs 10
+  python report_artifacts.py --runtime-path /path/to/lambda-runtime-packages
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+from build_lambdas import DIST_DIR, FUNCTIONS
+
+# packages the python3.x Lambda runtime ships, made importable during the test
+RUNTIME_PACKAGES = ("boto3", "botocore", "s3transfer", "jmespath", "dateutil", "urllib3", "six")
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+sys.path.append(sys.argv[3])
+t0 = time.perf_counter()
+__import__(sys.argv[2])
+print(time.perf_counter() - t0)
+"""
+
+def link_runtime_packages(dest):
+    """
+    Symlink the host's copies of RUNTIME_PACKAGES into dest, so the test
+    interpreter sees boto3 without the rest of the host's site-packages.
+    """
+    for name in RUNTIME_PACKAGES:
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.origin is None:
+            if name == "boto3":
+                raise RuntimeError("boto3 is not installed on this host; pass --runtime-path")
+            continue
+        if spec.submodule_search_locations:
+            src = list(spec.submodule_search_locations)[0]
+        else:
+            src = spec.origin
+        os.symlink(src, os.path.join(dest, os.path.basename(src)))
+    return dest
+
+def measure_import(root, module, runs, runtime_path):
+    env = dict(os.environ)
+    # handlers create boto3 clients at import time, which needs a region
+    env.setdefault("AWS_REGION", "us-east-1")
+    env.setdefault("AWS_DEFAULT_REGION", env["AWS_REGION"])
+    samples = []
+    for _ in range(runs):
+        # a fresh, empty matplotlib config/cache dir per run: Lambda starts with
+        # an empty /tmp, so every cold start rebuilds the font cache. This also
+        # keeps the test from writing into the host's ~/.cache/matplotlib.
+        with tempfile.TemporaryDirectory() as cache:
+            env["MPLCONFIGDIR"] = cache
+            env["XDG_CACHE_HOME"] = cache
+            # -I: no cwd/user site/PYTHON* env, -S: no site-packages, -B: no .pyc writes
+            out = subprocess.run(
+                [sys.executable, "-I", "-S", "-B", "-c", IMPORT_SNIPPET, root, module, runtime_path],
+                env=env, cwd=root, capture_output=True, text=True,
+            )
+        if out.returncode != 0:
+            last = (out.stderr.strip().splitlines() or ["unknown error"])[-1]
+            raise RuntimeError(last)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def report(name, runs, runtime_path):
+    zip_path = os.path.join(DIST_DIR, name + ".zip")
+    if not os.path.exists(zip_path):
+        return f"{name:<15} {'-':>12} {'-':>12}  (not built)"
+    with zipfile.ZipFile(zip_path) as zf:
+        unpacked = sum(i.file_size for i in zf.infolist())
+        with tempfile.TemporaryDirectory() as tmp:
+            zf.extractall(tmp)
+            try:
+                seconds = measure_import(tmp, FUNCTIONS[name]["handler"], runs, runtime_path)
+                timing = f"{seconds * 1000:>10.1f}ms"
+            except RuntimeError as e:
+                timing = f"{'error':>12}  ({e})"
+    zipped = os.path.getsize(zip_path)
+    return f"{name:<15} {zipped:>12} {unpacked:>12} {timing}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Report lambda artifact size and import time")
+    parser.add_argument("functions", nargs="*",
+                        help="functions to report: %s (default: all)" % ", ".join(sorted(FUNCTIONS)))
+    parser.add_argument("--runs", type=int, default=5, help="import runs per handler (default: 5)")
+    parser.add_argument("--runtime-path",
+                        help="dir holding the runtime-provided packages (default: link boto3 & deps from this host)")
+    args = parser.parse_args()
+    unknown = set(args.functions) - set(FUNCTIONS)
+    if unknown:
+        parser.error("unknown function(s): " + ", ".join(sorted(unknown)))
+    with tempfile.TemporaryDirectory() as linked:
+        runtime_path = args.runtime_path
+        if runtime_path is None:
+            try:
+                runtime_path = link_runtime_packages(linked)
+            except RuntimeError as e:
+                parser.error(str(e))
+        print(f"{'function':<15} {'zip bytes':>12} {'unpacked':>12} {'import':>12}")
+        for name in args.functions or sorted(FUNCTIONS):
+            print(report(name, args.runs, os.path.abspath(runtime_path)))
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ import time
 REGION = "us-east-1"           
 BUCKET = "testbucket-mandar-cs6620" 
 TABLE_NAME = "S3-object-size-history"
+STATS_TABLE_NAME = "S3-object-size-stats"
 
 s3 = boto3.client("s3", region_name=REGION)
 ddb = boto3.client("dynamodb", region_name=REGION)
@@ -68,7 +69,33 @@ def create_table():
             print("Table create error:", e)
             raise
 
+def create_stats_table():
+    # one item per bucket: streaming stats written by size_tracking_lambda
+    try:
+        print(f"Creating DynamoDB table: {STATS_TABLE_NAME} (PAY_PER_REQUEST) ...")
+        resp = ddb.create_table(
+            TableName=STATS_TABLE_NAME,
+            AttributeDefinitions=[
+                {'AttributeName': 'bucket_name', 'AttributeType': 'S'}
+            ],
+            KeySchema=[
+                {'AttributeName': 'bucket_name', 'KeyType': 'HASH'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        print("Table creation initiated:", resp['TableDescription']['TableName'])
+        waiter = ddb.get_waiter('table_exists')
+        waiter.wait(TableName=STATS_TABLE_NAME)
+        print("DynamoDB stats table active.")
+    except botocore.exceptions.ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Stats table already exists.")
+        else:
+            print("Stats table create error:", e)
+            raise
+
 if __name__ == "__main__":
     create_bucket()
     create_table()
+    create_stats_table()
     print("Setup complete.")
\ No newline at end of file
@@ -0,0 +1,82 @@
+# size_stats.py
+"""
+Streaming per-bucket statistics over the size-history stream.
+State is a small fixed dict kept under "stats" on the bucket's single item
+in the stats table, so size_tracking_lambda updates it from that one item:
+  n      number of size deltas seen
+  mean   EWMA of the size delta (bytes)
+  var    EWMA variance of the size delta
+  rate   EWMA growth rate (bytes/s)
+  p50    exponentially-weighted (rolling) median of |delta|
+  p95    exponentially-weighted (rolling) 95th percentile of |delta|
+A write is flagged anomalous when its delta is more than Z_THRESHOLD
+deviations from the EWMA mean, once WARMUP deltas have been seen. The
+deviation is the EWMA standard deviation, floored at p50, at MIN_REL_DEV of
+the previous bucket size and at MIN_DEV_BYTES, so a bucket that has only
+seen same-size overwrites doesn't flag the next ordinary upload.
+"""
+
+import math
+import os
+from decimal import Decimal
+
+ALPHA = float(os.environ.get("STATS_ALPHA", "0.1"))
+Z_THRESHOLD = float(os.environ.get("ANOMALY_Z", "4.0"))
+WARMUP = int(os.environ.get("ANOMALY_WARMUP", "10"))
+# deviation floors: with Z_THRESHOLD=4, nothing under 4% of the bucket or 1 KiB flags
+MIN_REL_DEV = float(os.environ.get("ANOMALY_MIN_REL_DEV", "0.01"))
+MIN_DEV_BYTES = float(os.environ.get("ANOMALY_MIN_DEV_BYTES", "256"))
+
+def initial_stats():
+    return {"n": 0, "mean": 0.0, "var": 0.0, "rate": 0.0, "p50": 0.0, "p95": 0.0}
+
+def _update_quantile(q, x, p):
+    # stochastic-approximation quantile: move up by p*step when x is above q,
+    # down by (1-p)*step otherwise; settles where P(x <= q) = p. The step is
+    # relative to q so the estimate tracks both small and large buckets.
+    step = ALPHA * max(q, 1.0)
+    return max(0.0, q + step * (p - (1.0 if x <= q else 0.0)))
+
+def update(stats, prev_ts, prev_size, ts, size):
+    """
+    Fold one new (ts ms, size) observation into stats.
+    Returns (new_stats, anomaly, zscore); stats is not modified.
+    """
+    s = dict(stats)
+    delta = float(size - prev_size)
+    dt = (ts - prev_ts) / 1000.0
+    n, mean, var = int(s["n"]), float(s["mean"]), float(s["var"])
+
+    # floor the deviation, scaled to the bucket: after a run of identical
+    # deltas var and p50 decay to 0 and any small change would otherwise flag
+    std = max(math.sqrt(var), float(s["p50"]), MIN_REL_DEV * abs(prev_size), MIN_DEV_BYTES)
+    zscore = (delta - mean) / std
+    anomaly = n >= WARMUP and abs(zscore) > Z_THRESHOLD
+
+    if n == 0:
+        mean, var = delta, 0.0
+        s["rate"] = delta / dt if dt > 0 else 0.0
+        s["p50"] = s["p95"] = abs(delta)
+    else:
+        diff = delta - mean
+        incr = ALPHA * diff
+        mean += incr
+        var = (1 - ALPHA) * (var + diff * incr)
+        if dt > 0:
+            s["rate"] = (1 - ALPHA) * float(s["rate"]) + ALPHA * (delta / dt)
+        s["p50"] = _update_quantile(float(s["p50"]), abs(delta), 0.50)
+        s["p95"] = _update_quantile(float(s["p95"]), abs(delta), 0.95)
+    s.update(n=n + 1, mean=mean, var=var)
+    return s, anomaly, zscore
+
+def to_item(stats):
+    """DynamoDB (boto3 resource) rejects floats; store as Decimal."""
+    return {k: (v if isinstance(v, int) else Decimal(repr(round(v, 6))))
+            for k, v in stats.items()}
+
+def from_item(item_stats):
+    if not item_stats:
+        return initial_stats()
+    s = initial_stats()
+    s.update({k: (int(v) if k == "n" else float(v)) for k, v in item_stats.items() if k in s})
+    return s
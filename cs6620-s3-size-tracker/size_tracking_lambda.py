@@ -3,12 +3,20 @@ import boto3
 import time
 import os
 import traceback
+import json
+from decimal import Decimal
+import botocore
+from boto3.dynamodb.conditions import Attr
+import size_stats
 
 TABLE_NAME = os.environ.get("DDB_TABLE", "S3-object-size-history")
 # optional: region via env AWS_REGION; boto3 will use default otherwise
 dynamodb = boto3.resource("dynamodb")
 s3 = boto3.client("s3")
 table = dynamodb.Table(TABLE_NAME)
+# one item per bucket holding the streaming stats (see size_stats.py)
+STATS_TABLE_NAME = os.environ.get("STATS_TABLE", "S3-object-size-stats")
+stats_table = dynamodb.Table(STATS_TABLE_NAME)
 
 def safe_list_objects_total(bucket, attempts=3, backoff_s=0.5):
     for attempt in range(1, attempts+1):
@@ -28,10 +36,54 @@ def safe_list_objects_total(bucket, attempts=3, backoff_s=0.5):
     # fallback
     return 0, 0
 
+def update_stats(bucket, ts, size, attempts=5, backoff_s=0.05):
+    """
+    Fold (ts, size) into the bucket's item in the stats table and return
+    (anomaly, zscore). The read is strongly consistent and the write is
+    conditioned on the version read, so concurrent invocations from an S3
+    burst retry instead of overwriting each other. A listing older than the
+    one already recorded is not folded in and returns (False, None).
+    """
+    for attempt in range(1, attempts+1):
+        state = stats_table.get_item(Key={"bucket_name": bucket}, ConsistentRead=True).get("Item")
+        if state is None:
+            stats, anomaly, zscore = size_stats.initial_stats(), False, None
+            version = 0
+            condition = Attr("bucket_name").not_exists()
+        else:
+            if ts <= int(state["last_ts"]):
+                return False, None
+            stats, anomaly, zscore = size_stats.update(
+                size_stats.from_item(state.get("stats")),
+                int(state["last_ts"]), int(state["last_size"]),
+                ts, size,
+            )
+            version = int(state["version"])
+            condition = Attr("version").eq(version)
+        try:
+            stats_table.put_item(
+                Item={
+                    "bucket_name": bucket,
+                    "version": version + 1,
+                    "last_ts": ts,
+                    "last_size": size,
+                    "stats": size_stats.to_item(stats),
+                },
+                ConditionExpression=condition,
+            )
+            return anomaly, zscore
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException' or attempt == attempts:
+                raise
+            time.sleep(backoff_s * attempt)
+
 def lambda_handler(event, context):
     """
     Triggered by S3 events (ObjectCreated:Object*, ObjectRemoved:*)
     Computes total size and number of objects in bucket, then writes an item to DynamoDB.
+    Also updates the bucket's streaming stats (see update_stats) and flags
+    unusual size jumps on the history item (anomaly, zscore). A stats failure
+    is logged and the history item is written without those fields.
     """
     try:
         records = event.get("Records", [])
@@ -47,9 +99,19 @@ def lambda_handler(event, context):
             "size": total_size,
             "object_count": total_count
         }
+        try:
+            anomaly, zscore = update_stats(bucket, ts, total_size)
+            item["anomaly"] = anomaly
+            if zscore is not None:
+                item["zscore"] = Decimal(repr(round(zscore, 3)))
+        except Exception as e:
+            # stats are optional; never let them cost us the history row
+            print("Stats update failed, writing history without anomaly:", e)
+            traceback.print_exc()
         table.put_item(Item=item)
         print("Wrote to DDB:", item)
-        return {"status": "ok", "item": item}
+        # Decimal zscore is not JSON serializable in the Lambda response
+        return {"status": "ok", "item": json.loads(json.dumps(item, default=float))}
     except Exception as e:
         print("Error in size_tracking_lambda:", e)
         traceback.print_exc()
@@ -0,0 +1,319 @@
+# snapshot.py
+"""
+Columnar snapshots of a bucket's size history, so plotting_lambda can replay
+historical windows without touching DynamoDB.
+
+Export (run locally with AWS credentials):
+  python snapshot.py export --bucket testbucket-mandar-cs6620 --out snapshots/history.snap.gz
+  python snapshot.py export --bucket testbucket-mandar-cs6620 --segments 4 \
+      --out s3://testbucket-mandar-cs6620/snapshots/history.snap.gz
+
+Snapshot layout (little-endian), stored gzip-compressed:
+  header  <8sIIQ  magic, bucket name length, reserved, row count
+  name    bucket name, zero-padded to a multiple of 8 bytes
+  ts      int64[count]  epoch ms, ascending
+  size    int64[count]
+  high    int64[count]  running max of size, i.e. the historical high as of ts
+  objects int64[count]
+  anomaly uint8[count]  size_tracking_lambda's anomaly flag
+Readers decompress once into /tmp and memory-map the raw file, so repeated
+window reads in a warm container are just binary searches over the ts column.
+"""
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+
+MAGIC = b"S3SZSNP1"
+HEADER = struct.Struct("<8sIIQ")
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "snapshots")
+# total decompressed bytes kept under CACHE_DIR (Lambda /tmp defaults to 512 MB)
+CACHE_MAX_BYTES = int(os.environ.get("SNAPSHOT_CACHE_MAX_BYTES", str(256 << 20)))
+TABLE_NAME = os.environ.get("DDB_TABLE", "S3-object-size-history")
+
+if sys.byteorder != "little":
+    raise ImportError("snapshot columns are memory-mapped as little-endian int64")
+
+def _pad8(n):
+    return (n + 7) // 8 * 8
+
+# ---------- export ----------
+
+def _projection():
+    # only the columns the snapshot stores; "size" is a DynamoDB reserved word.
+    # Fresh dicts each call: boto3 merges condition placeholders into them.
+    return {
+        "ProjectionExpression": "ts, #s, object_count, anomaly",
+        "ExpressionAttributeNames": {"#s": "size"},
+    }
+
+def new_table(table_name=TABLE_NAME):
+    """
+    A Table on its own boto3 session. boto3 resources are not thread-safe,
+    so every parallel-scan worker gets its own.
+    """
+    import boto3
+    return boto3.session.Session().resource("dynamodb").Table(table_name)
+
+def _query_pages(table, bucket):
+    from boto3.dynamodb.conditions import Key
+    kwargs = {
+        "KeyConditionExpression": Key("bucket_name").eq(bucket),
+        "ScanIndexForward": True,
+        **_projection(),
+    }
+    while True:
+        resp = table.query(**kwargs)
+        yield resp.get("Items", [])
+        if "LastEvaluatedKey" not in resp:
+            return
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+def _columns():
+    return array("q"), array("q"), array("q"), array("B")
+
+def _scan_segment(make_table, bucket, segment, total_segments, out, errors, lock):
+    from boto3.dynamodb.conditions import Attr
+    try:
+        table = make_table()
+        cols = _columns()
+        kwargs = {
+            "FilterExpression": Attr("bucket_name").eq(bucket),
+            "Segment": segment,
+            "TotalSegments": total_segments,
+            **_projection(),
+        }
+        while True:
+            resp = table.scan(**kwargs)
+            _append_items(resp.get("Items", []), cols)
+            if "LastEvaluatedKey" not in resp:
+                break
+            kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    except Exception as e:
+        # surfaced by collect_history instead of dying silently in the thread
+        with lock:
+            errors.append(e)
+        return
+    with lock:
+        out.append(cols)
+
+def _append_items(items, cols):
+    ts, size, objects, anomaly = cols
+    for item in items:
+        ts.append(int(item["ts"]))
+        size.append(int(item.get("size", 0)))
+        objects.append(int(item.get("object_count", 0)))
+        anomaly.append(1 if item.get("anomaly") else 0)
+
+def collect_history(make_table, bucket, segments=0):
+    """
+    Read every history row for bucket into (ts, size, objects, anomaly)
+    arrays, ordered by ts. segments=0 pages through a Query on the partition key;
+    segments>1 runs a parallel Scan with that many Segment/TotalSegments workers.
+    make_table is called once per worker and must return a fresh Table.
+    """
+    cols = _columns()
+    if segments <= 1:
+        for items in _query_pages(make_table(), bucket):
+            _append_items(items, cols)
+        return cols
+
+    parts, errors, lock = [], [], threading.Lock()
+    workers = [
+        threading.Thread(target=_scan_segment,
+                         args=(make_table, bucket, i, segments, parts, errors, lock))
+        for i in range(segments)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    if errors:
+        raise RuntimeError(f"{len(errors)} scan segment(s) failed") from errors[0]
+    for part in parts:
+        for col, part_col in zip(cols, part):
+            col.extend(part_col)
+    # scan segments are unordered; sort all columns together by ts
+    ts = cols[0]
+    order = sorted(range(len(ts)), key=ts.__getitem__)
+    return tuple(array(col.typecode, (col[i] for i in order)) for col in cols)
+
+def write_snapshot(fileobj, bucket, ts, size, objects, anomaly):
+    name = bucket.encode("utf-8")
+    high, running = array("q"), 0
+    for value in size:
+        running = max(running, value)
+        high.append(running)
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+        gz.write(HEADER.pack(MAGIC, len(name), 0, len(ts)))
+        gz.write(name.ljust(_pad8(len(name)), b"\0"))
+        for column in (ts, size, high, objects, anomaly):
+            gz.write(column.tobytes())
+
+def export_snapshot(bucket, dest, segments=0, make_table=new_table):
+    """Export bucket's full history to dest (local path or s3://bucket/key)."""
+    cols = collect_history(make_table, bucket, segments)
+    if dest.startswith("s3://"):
+        import boto3
+        s3_bucket, key = _split_s3(dest)
+        with tempfile.TemporaryFile() as tmp:
+            write_snapshot(tmp, bucket, *cols)
+            tmp.seek(0)
+            boto3.client("s3").upload_fileobj(tmp, s3_bucket, key)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        with open(dest, "wb") as f:
+            write_snapshot(f, bucket, *cols)
+    print(f"Exported {len(cols[0])} rows for {bucket} to {dest}")
+    return len(cols[0])
+
+# ---------- read ----------
+
+def _split_s3(uri):
+    s3_bucket, _, key = uri[len("s3://"):].partition("/")
+    if not s3_bucket or not key:
+        raise ValueError(f"bad S3 URI: {uri}")
+    return s3_bucket, key
+
+class Snapshot:
+    """Memory-mapped view over a decompressed snapshot file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, name_len, _, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a size-history snapshot")
+        off = HEADER.size
+        self.bucket = bytes(self._mm[off:off + name_len]).decode("utf-8")
+        off += _pad8(name_len)
+        view = memoryview(self._mm)
+        step = count * 8
+        self.ts = view[off:off + step].cast("q")
+        self.size = view[off + step:off + 2 * step].cast("q")
+        self.high = view[off + 2 * step:off + 3 * step].cast("q")
+        self.objects = view[off + 3 * step:off + 4 * step].cast("q")
+        off += 4 * step
+        self.anomaly = view[off:off + count]
+
+    def __len__(self):
+        return len(self.ts)
+
+    def close(self):
+        for view in (self.ts, self.size, self.high, self.objects, self.anomaly):
+            view.release()
+        self._mm.close()
+
+    def window(self, start_ms, end_ms):
+        """Row slice [lo, hi) with start_ms <= ts <= end_ms."""
+        lo = bisect.bisect_left(self.ts, start_ms)
+        hi = bisect.bisect_right(self.ts, end_ms)
+        return lo, hi
+
+# source -> (raw path, Snapshot), least recently used first
+_open = OrderedDict()
+
+def _materialize(source):
+    """
+    Decompress source into CACHE_DIR once per container; return raw path.
+    The cache key includes the S3 ETag (one HEAD per call) or the local
+    mtime/size, so re-exporting to the same key or path is picked up.
+    """
+    if source.startswith("s3://"):
+        import boto3
+        s3 = boto3.client("s3")
+        s3_bucket, key = _split_s3(source)
+        etag = s3.head_object(Bucket=s3_bucket, Key=key)["ETag"]
+        tag = f"{source}:{etag}"
+    else:
+        st = os.stat(source)
+        tag = f"{os.path.abspath(source)}:{st.st_mtime_ns}:{st.st_size}"
+    digest = hashlib.sha1(tag.encode("utf-8")).hexdigest()[:16]
+    raw_path = os.path.join(CACHE_DIR, digest + ".snap")
+    if os.path.exists(raw_path):
+        return raw_path
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = raw_path + ".part"
+    if source.startswith("s3://"):
+        # IfMatch: fail rather than cache a newer object under the old ETag
+        body = s3.get_object(Bucket=s3_bucket, Key=key, IfMatch=etag)["Body"]
+        src = gzip.GzipFile(fileobj=body, mode="rb")
+    else:
+        src = gzip.open(source, "rb")
+    with src, open(tmp_path, "wb") as out:
+        shutil.copyfileobj(src, out, 1 << 20)
+    os.replace(tmp_path, raw_path)
+    return raw_path
+
+def _evict(raw_path, snap):
+    snap.close()
+    try:
+        os.remove(raw_path)
+    except FileNotFoundError:
+        pass
+
+def open_snapshot(source):
+    """
+    Open (and cache) the snapshot at a local path or s3://bucket/key.
+    When a source changes (new ETag/mtime) its old decompressed copy is
+    closed and deleted, and least recently used sources are evicted once
+    the cache holds more than CACHE_MAX_BYTES.
+    """
+    raw_path = _materialize(source)
+    entry = _open.pop(source, None)
+    if entry is not None and entry[0] != raw_path:
+        _evict(*entry)
+        entry = None
+    snap = entry[1] if entry is not None else Snapshot(raw_path)
+    _open[source] = (raw_path, snap)
+
+    total = sum(os.path.getsize(path) for path, _ in _open.values())
+    while total > CACHE_MAX_BYTES and len(_open) > 1:
+        _, (old_path, old_snap) = _open.popitem(last=False)
+        total -= os.path.getsize(old_path)
+        _evict(old_path, old_snap)
+    return snap
+
+def load_window(source, start_s=None, end_s=None, window_s=10):
+    """
+    Return (xs, ys, flags, max_size, bucket) for a window of the snapshot, in
+    the same shape query_last_10_seconds/query_max_size produce. end_s defaults
+    to the last row, start_s to end_s - window_s. max_size is the historical
+    high as of end_s, matching what the live plot would have shown then.
+    """
+    snap = open_snapshot(source)
+    if end_s is None:
+        end_s = snap.ts[-1] / 1000.0 if len(snap) else 0.0
+    if start_s is None:
+        start_s = end_s - window_s
+    lo, hi = snap.window(int(start_s * 1000), int(end_s * 1000))
+    xs = [t / 1000.0 for t in snap.ts[lo:hi]]
+    ys = [float(s) for s in snap.size[lo:hi]]
+    flags = [bool(a) for a in snap.anomaly[lo:hi]]
+    max_size = float(snap.high[hi - 1]) if hi else 0.0
+    return xs, ys, flags, max_size, snap.bucket
+
+def main():
+    parser = argparse.ArgumentParser(description="Size-history snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="export a bucket's history from DynamoDB")
+    exp.add_argument("--bucket", required=True, help="tracked bucket name")
+    exp.add_argument("--out", required=True, help="local path or s3://bucket/key")
+    exp.add_argument("--segments", type=int, default=0,
+                     help="parallel Scan segments (default: paginated Query)")
+    args = parser.parse_args()
+    if args.command == "export":
+        export_snapshot(args.bucket, args.out, segments=args.segments)
+
+if __name__ == "__main__":
+    main()
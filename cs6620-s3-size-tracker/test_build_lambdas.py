@@ -0,0 +1,150 @@
+import ast
+import os
+import sys
+import zipfile
+
+import pytest
+
+import build_lambdas
+
+# --- Fixtures ---
+
+def touch(root, rel, size=10):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+FAKE_TREE = [
+    "matplotlib/__init__.py",
+    "matplotlib/pyplot.py",
+    "matplotlib/matplotlibrc",
+    "matplotlib/backends/__init__.py",
+    "matplotlib/backends/backend_agg.py",
+    "matplotlib/backends/_backend_agg.cpython-311-x86_64-linux-gnu.so",
+    "matplotlib/backends/backend_qtagg.py",
+    "matplotlib/backends/backend_pdf.py",
+    "matplotlib/backends/_tkagg.cpython-311-x86_64-linux-gnu.so",
+    "matplotlib/backends/qt_editor/_formlayout.py",
+    "matplotlib/backends/web_backend/all_figures.html",
+    "matplotlib/mpl-data/matplotlibrc",
+    "matplotlib/mpl-data/stylelib/ggplot.mplstyle",
+    "matplotlib/mpl-data/fonts/ttf/DejaVuSans.ttf",
+    "matplotlib/mpl-data/fonts/ttf/DejaVuSans-Bold.ttf",
+    "matplotlib/mpl-data/fonts/afm/phvr8a.afm",
+    "matplotlib/mpl-data/fonts/pdfcorefonts/Helvetica.afm",
+    "matplotlib/mpl-data/images/home.png",
+    "matplotlib/mpl-data/sample_data/goog.npz",
+    "matplotlib/tests/test_axes.py",
+    "matplotlib/__pycache__/pyplot.cpython-311.pyc",
+    "numpy/__init__.py",
+    "numpy/core/include/numpy/ndarrayobject.h",
+    "numpy/core/tests/test_multiarray.py",
+    "numpy/__init__.pyi",
+    "PIL/__init__.py",
+]
+
+KEPT = {
+    "matplotlib/__init__.py",
+    "matplotlib/pyplot.py",
+    "matplotlib/matplotlibrc",
+    "matplotlib/backends/__init__.py",
+    "matplotlib/backends/backend_agg.py",
+    "matplotlib/backends/_backend_agg.cpython-311-x86_64-linux-gnu.so",
+    "matplotlib/mpl-data/matplotlibrc",
+    "matplotlib/mpl-data/stylelib/ggplot.mplstyle",
+    "matplotlib/mpl-data/fonts/ttf/DejaVuSans.ttf",
+    "numpy/__init__.py",
+    "PIL/__init__.py",
+}
+
+def files_under(root):
+    found = set()
+    for dirpath, _, filenames in os.walk(root):
+        for f in filenames:
+            found.add(os.path.relpath(os.path.join(dirpath, f), root).replace(os.sep, "/"))
+    return found
+
+@pytest.fixture
+def fake_site(tmp_path):
+    root = str(tmp_path / "staging")
+    for rel in FAKE_TREE:
+        touch(root, rel)
+    return root
+
+@pytest.fixture
+def build_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_lambdas, "BUILD_DIR", str(tmp_path / "build"))
+    monkeypatch.setattr(build_lambdas, "DIST_DIR", str(tmp_path / "dist"))
+    return tmp_path
+
+# --- Stripping ---
+
+def test_strip_tree_keeps_only_runtime_files(fake_site):
+    removed = build_lambdas.strip_tree(fake_site)
+    assert files_under(fake_site) == KEPT
+    assert removed == 10 * (len(FAKE_TREE) - len(KEPT))
+
+def test_strip_matplotlib_keeps_agg_extension_module(fake_site):
+    build_lambdas.strip_matplotlib(fake_site)
+    backends = os.listdir(os.path.join(fake_site, "matplotlib", "backends"))
+    assert "_backend_agg.cpython-311-x86_64-linux-gnu.so" in backends
+    assert "_tkagg.cpython-311-x86_64-linux-gnu.so" not in backends
+    assert not os.path.exists(os.path.join(fake_site, "matplotlib", "backends", "qt_editor"))
+
+def test_strip_matplotlib_keeps_default_font_only(fake_site):
+    build_lambdas.strip_matplotlib(fake_site)
+    fonts = files_under(os.path.join(fake_site, "matplotlib", "mpl-data", "fonts"))
+    assert fonts == {"ttf/" + f for f in build_lambdas.KEEP_MPL_FONTS}
+
+def test_strip_tree_without_matplotlib_is_noop_for_handlers(tmp_path):
+    root = str(tmp_path)
+    touch(root, "plotting_lambda.py")
+    touch(root, "png_line.py")
+    assert build_lambdas.strip_tree(root) == 0
+    assert files_under(root) == {"plotting_lambda.py", "png_line.py"}
+
+# --- Zips ---
+
+def test_write_zip_uses_relative_sorted_paths(fake_site, tmp_path):
+    out = str(tmp_path / "out.zip")
+    size = build_lambdas.write_zip(fake_site, out)
+    assert size == os.path.getsize(out)
+    with zipfile.ZipFile(out) as zf:
+        names = zf.namelist()
+    assert set(names) == set(FAKE_TREE)
+    # walk order is sorted, so rebuilding gives the same archive listing
+    build_lambdas.write_zip(fake_site, out)
+    with zipfile.ZipFile(out) as zf:
+        assert zf.namelist() == names
+
+@pytest.mark.parametrize("name", sorted(build_lambdas.FUNCTIONS))
+def test_build_zip_contains_handler_and_modules(name, build_dirs):
+    running = "%d.%d" % sys.version_info[:2]
+    out = build_lambdas.build(name, with_matplotlib=False, python_version=running)
+    spec = build_lambdas.FUNCTIONS[name]
+    expected = {m + ".py" for m in [spec["handler"]] + spec["modules"]}
+    with zipfile.ZipFile(out) as zf:
+        names = set(zf.namelist())
+    assert {n for n in names if n.endswith(".py")} == expected
+    # every module is precompiled next to its source
+    pyc = {n for n in names if n.endswith(".pyc")}
+    assert len(pyc) == len(expected)
+    assert all(n.startswith("__pycache__/") for n in pyc)
+
+@pytest.mark.parametrize("name", sorted(build_lambdas.FUNCTIONS))
+def test_function_modules_cover_local_imports(name):
+    # any repo module a packaged file imports must be packaged with it
+    spec = build_lambdas.FUNCTIONS[name]
+    packaged = [spec["handler"]] + spec["modules"]
+    local = {f[:-3] for f in os.listdir(build_lambdas.HERE) if f.endswith(".py")}
+    for module in packaged:
+        with open(os.path.join(build_lambdas.HERE, module + ".py")) as f:
+            tree = ast.parse(f.read())
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(a.name.split(".")[0] for a in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                imported.add(node.module.split(".")[0])
+        assert (imported & local) - set(packaged) == set(), module
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+import plotting_lambda
+from plotting_lambda import SNAPSHOT_PREFIX, parse_snapshot_params
+
+GOOD = SNAPSHOT_PREFIX + "history.snap.gz"
+
+# --- parse_snapshot_params ---
+
+def test_accepts_uri_under_prefix():
+    assert parse_snapshot_params({"snapshot": GOOD}) == (GOOD, None, None)
+
+def test_parses_start_and_end():
+    qs = {"snapshot": GOOD, "start": "1759976174", "end": "1759976184.5"}
+    assert parse_snapshot_params(qs) == (GOOD, 1759976174.0, 1759976184.5)
+
+def test_empty_bounds_mean_default():
+    assert parse_snapshot_params({"snapshot": GOOD, "start": "", "end": ""}) == (GOOD, None, None)
+
+@pytest.mark.parametrize("source", [
+    "/etc/passwd",
+    "history.snap.gz",
+    "file://" + GOOD,
+    "s3://some-other-bucket/snapshots/history.snap.gz",
+    SNAPSHOT_PREFIX.rstrip("/") + "-evil/history.snap.gz",
+    SNAPSHOT_PREFIX,  # prefix only, no key
+])
+def test_rejects_sources_outside_prefix(source):
+    with pytest.raises(ValueError, match="S3 URI under"):
+        parse_snapshot_params({"snapshot": source})
+
+@pytest.mark.parametrize("field", ["start", "end"])
+@pytest.mark.parametrize("value", ["abc", "nan", "inf", "-inf", "1e999", "12s"])
+def test_rejects_non_finite_or_non_numeric_bounds(field, value):
+    with pytest.raises(ValueError, match=f"{field} must be epoch seconds"):
+        parse_snapshot_params({"snapshot": GOOD, field: value})
+
+# --- lambda_handler ---
+
+@pytest.mark.parametrize("qs", [
+    {"snapshot": "/etc/passwd"},
+    {"snapshot": GOOD, "start": "nan"},
+    {"snapshot": GOOD, "end": "yesterday"},
+])
+def test_handler_returns_400_before_touching_aws(qs, monkeypatch):
+    def no_aws(*args, **kwargs):
+        raise AssertionError("AWS must not be called for a rejected request")
+    monkeypatch.setattr(plotting_lambda, "upload_plot", no_aws)
+    monkeypatch.setattr(plotting_lambda, "query_last_10_seconds", no_aws)
+    resp = plotting_lambda.lambda_handler({"queryStringParameters": qs}, None)
+    assert resp["statusCode"] == 400
+    assert "error" in json.loads(resp["body"])
+
+def test_bad_request_shape():
+    resp = plotting_lambda.bad_request("nope")
+    assert resp == {
+        "statusCode": 400,
+        "headers": {"Content-Type": "application/json"},
+        "body": '{"error": "nope"}',
+    }
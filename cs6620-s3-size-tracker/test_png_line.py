@@ -0,0 +1,30 @@
+import struct
+import zlib
+
+import png_line
+
+def read_png_chunks(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, off = [], 8
+    while off < len(data):
+        (length,) = struct.unpack(">I", data[off:off + 4])
+        tag, body = data[off + 4:off + 8], data[off + 8:off + 8 + length]
+        (crc,) = struct.unpack(">I", data[off + 8 + length:off + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff
+        chunks.append((tag, body))
+        off += 12 + length
+    return chunks
+
+def test_render_line_png_is_valid_png():
+    buf = png_line.render_line_png([1, 2, 3, 4], [19, 28, 0, 2], hline=28,
+                                   width=200, height=100, flags=[False, True, False, False])
+    chunks = read_png_chunks(buf.read())
+    assert [tag for tag, _ in chunks] == [b"IHDR", b"IDAT", b"IEND"]
+    width, height, depth, color = struct.unpack(">IIBB", chunks[0][1][:10])
+    assert (width, height, depth, color) == (200, 100, 8, 2)
+    # one filter byte + RGB per pixel on every row
+    assert len(zlib.decompress(chunks[1][1])) == height * (1 + width * 3)
+
+def test_render_line_png_handles_empty_series():
+    chunks = read_png_chunks(png_line.render_line_png([], [], width=50, height=40).read())
+    assert chunks[0][0] == b"IHDR"
@@ -0,0 +1,88 @@
+import random
+from decimal import Decimal
+
+import size_stats
+
+def feed(deltas, start_size=0):
+    """Run deltas (one write per second) through update; return per-write (anomaly, zscore)."""
+    stats, size, results = size_stats.initial_stats(), start_size, []
+    for i, delta in enumerate(deltas, 1):
+        stats, anomaly, zscore = size_stats.update(stats, (i - 1) * 1000, size, i * 1000, size + delta)
+        size += delta
+        results.append((anomaly, zscore))
+    return stats, results
+
+# --- Warm-up ---
+
+def test_nothing_flagged_during_warmup():
+    _, results = feed(([10, 5000, -5000, 10000, 0] * size_stats.WARMUP)[:size_stats.WARMUP])
+    assert not any(anomaly for anomaly, _ in results)
+
+def test_first_delta_after_warmup_can_flag():
+    _, results = feed([10] * size_stats.WARMUP + [100000])
+    assert results[-1][0]
+
+# --- Jumps vs noise ---
+
+def test_jump_flagged_noise_not():
+    rng = random.Random(0)
+    deltas = [rng.randint(0, 100) for _ in range(300)]
+    deltas[200] = 5000
+    _, results = feed(deltas)
+    flagged = [i for i, (anomaly, _) in enumerate(results) if anomaly]
+    assert flagged == [200]
+
+def test_steady_deltas_do_not_flag_small_change():
+    # var is 0 after identical deltas; the floor keeps z finite and small
+    _, results = feed([10] * 12 + [11])
+    anomaly, zscore = results[-1]
+    assert not anomaly
+    assert abs(zscore) < 1
+
+def test_one_byte_change_after_overwrites_not_flagged():
+    _, results = feed([0] * 20 + [1])
+    assert not results[-1][0]
+
+def test_small_change_after_overwrites_not_flagged():
+    # the case p50 alone missed: it decays to 0 over same-size overwrites
+    _, results = feed([0] * 15 + [100])
+    assert not results[-1][0]
+
+def test_realistic_upload_after_overwrites():
+    # a 200 KB bucket rewritten in place, then an ordinary 3 KB upload
+    # (not flagged) versus a 60 KB upload (flagged)
+    deltas = [4096] * 10 + [0] * 30
+    _, results = feed(deltas + [3000], start_size=160000)
+    assert not results[-1][0]
+    _, results = feed(deltas + [60000], start_size=160000)
+    assert results[-1][0]
+
+def test_floor_scales_with_bucket_size():
+    # the same 5 KB jump is notable for a small bucket, routine for a large one
+    steady = [0] * 20
+    _, small = feed(steady + [5000], start_size=10000)
+    _, large = feed(steady + [5000], start_size=10000000)
+    assert small[-1][0]
+    assert not large[-1][0]
+
+# --- Derived stats ---
+
+def test_growth_rate_and_percentiles_track_stream():
+    stats, _ = feed([50] * 200)
+    assert stats["n"] == 200
+    assert abs(stats["mean"] - 50) < 1e-6
+    assert abs(stats["rate"] - 50) < 1e-6
+    assert abs(stats["p50"] - 50) < 10
+    assert stats["p95"] >= stats["p50"]
+
+def test_item_round_trip():
+    stats, _ = feed([3, 9, 4])
+    item = size_stats.to_item(stats)
+    assert isinstance(item["n"], int)
+    assert all(isinstance(v, Decimal) for k, v in item.items() if k != "n")
+    back = size_stats.from_item(item)
+    assert back["n"] == stats["n"]
+    assert abs(back["mean"] - stats["mean"]) < 1e-5
+
+def test_from_item_defaults_when_missing():
+    assert size_stats.from_item(None) == size_stats.initial_stats()
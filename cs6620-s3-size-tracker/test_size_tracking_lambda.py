@@ -0,0 +1,190 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+import size_tracking_lambda
+from size_tracking_lambda import STATS_TABLE_NAME, TABLE_NAME
+
+BUCKET = "tracked-bucket"
+
+# --- Fixtures for setting up mock AWS environment ---
+
+@pytest.fixture(scope="function")
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_SECURITY_TOKEN", "testing")
+
+def create_history_table(ddb):
+    ddb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "bucket_name", "KeyType": "HASH"},
+            {"AttributeName": "ts", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "bucket_name", "AttributeType": "S"},
+            {"AttributeName": "ts", "AttributeType": "N"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return ddb.Table(TABLE_NAME)
+
+def create_stats_table(ddb):
+    ddb.create_table(
+        TableName=STATS_TABLE_NAME,
+        KeySchema=[{"AttributeName": "bucket_name", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "bucket_name", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return ddb.Table(STATS_TABLE_NAME)
+
+@pytest.fixture(scope="function")
+def aws(aws_credentials, monkeypatch):
+    """S3 bucket + history table wired into the module; no stats table yet."""
+    with mock_aws():
+        ddb = boto3.resource("dynamodb", region_name="us-east-1")
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        history = create_history_table(ddb)
+        monkeypatch.setattr(size_tracking_lambda, "s3", s3)
+        monkeypatch.setattr(size_tracking_lambda, "table", history)
+        monkeypatch.setattr(size_tracking_lambda, "stats_table", ddb.Table(STATS_TABLE_NAME))
+        yield {"ddb": ddb, "s3": s3, "history": history}
+
+def s3_event():
+    return {"Records": [{"s3": {"bucket": {"name": BUCKET}}}]}
+
+def history_rows(history):
+    return history.scan()["Items"]
+
+# --- lambda_handler ---
+
+def test_handler_writes_history_with_stats(aws):
+    create_stats_table(aws["ddb"])
+    aws["s3"].put_object(Bucket=BUCKET, Key="a.txt", Body=b"x" * 19)
+    resp = size_tracking_lambda.lambda_handler(s3_event(), None)
+    assert resp["status"] == "ok"
+    (row,) = history_rows(aws["history"])
+    assert row["size"] == 19 and row["object_count"] == 1
+    assert row["anomaly"] is False
+
+def test_handler_writes_history_when_stats_table_missing(aws):
+    aws["s3"].put_object(Bucket=BUCKET, Key="a.txt", Body=b"x" * 28)
+    resp = size_tracking_lambda.lambda_handler(s3_event(), None)
+    assert resp["status"] == "ok"
+    (row,) = history_rows(aws["history"])
+    assert row["size"] == 28
+    assert "anomaly" not in row and "zscore" not in row
+
+def test_handler_writes_history_when_stats_retries_run_out(aws, monkeypatch):
+    def contended(*args, **kwargs):
+        raise size_tracking_lambda.botocore.exceptions.ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": "lost"}}, "PutItem")
+    monkeypatch.setattr(size_tracking_lambda, "update_stats", contended)
+    size_tracking_lambda.lambda_handler(s3_event(), None)
+    (row,) = history_rows(aws["history"])
+    assert "anomaly" not in row
+
+def test_handler_fails_when_history_write_fails(aws):
+    aws["history"].delete()
+    with pytest.raises(Exception):
+        size_tracking_lambda.lambda_handler(s3_event(), None)
+
+# --- update_stats: version-conditioned write ---
+
+class RacingStatsTable:
+    """
+    Wraps the real (moto) stats table. Before each of the first `races`
+    put_item calls, a competing invocation commits its own update, so the
+    caller's condition fails exactly as it would during an S3 burst.
+    """
+
+    def __init__(self, table, races):
+        self.table = table
+        self.races = races
+        self.puts = 0
+
+    def get_item(self, **kwargs):
+        return self.table.get_item(**kwargs)
+
+    def put_item(self, **kwargs):
+        self.puts += 1
+        if self.races > 0:
+            self.races -= 1
+            state = self.table.get_item(Key={"bucket_name": BUCKET}).get("Item")
+            version = int(state["version"]) if state else 0
+            last_ts = int(state["last_ts"]) if state else 0
+            self.table.put_item(Item={
+                "bucket_name": BUCKET, "version": version + 1,
+                "last_ts": last_ts + 1, "last_size": 500, "stats": {"n": 0},
+            })
+        return self.table.put_item(**kwargs)
+
+@pytest.fixture(scope="function")
+def stats_table(aws):
+    return create_stats_table(aws["ddb"])
+
+def stats_item(table):
+    return table.get_item(Key={"bucket_name": BUCKET}, ConsistentRead=True)["Item"]
+
+def test_first_write_creates_item(stats_table):
+    assert size_tracking_lambda.update_stats(BUCKET, 1000, 19) == (False, None)
+    item = stats_item(stats_table)
+    assert item["version"] == 1
+    assert item["last_ts"] == 1000 and item["last_size"] == 19
+    assert item["stats"]["n"] == 0
+
+def test_second_write_folds_delta_and_bumps_version(stats_table):
+    size_tracking_lambda.update_stats(BUCKET, 1000, 19)
+    anomaly, zscore = size_tracking_lambda.update_stats(BUCKET, 2000, 47)
+    assert anomaly is False and zscore is not None
+    item = stats_item(stats_table)
+    assert item["version"] == 2
+    assert item["last_size"] == 47
+    assert item["stats"]["n"] == 1
+    assert float(item["stats"]["mean"]) == 28.0
+
+def test_first_write_loses_not_exists_race_and_retries(stats_table, monkeypatch):
+    racing = RacingStatsTable(stats_table, races=1)
+    monkeypatch.setattr(size_tracking_lambda, "stats_table", racing)
+    size_tracking_lambda.update_stats(BUCKET, 5000, 800, backoff_s=0)
+    assert racing.puts == 2
+    item = stats_item(stats_table)
+    # folded on top of the competitor's committed state, not overwriting it
+    assert item["version"] == 2
+    assert item["last_size"] == 800
+    assert item["stats"]["n"] == 1
+    assert float(item["stats"]["mean"]) == 300.0
+
+def test_version_conflict_retries_until_write_lands(stats_table, monkeypatch):
+    size_tracking_lambda.update_stats(BUCKET, 1000, 19)
+    racing = RacingStatsTable(stats_table, races=3)
+    monkeypatch.setattr(size_tracking_lambda, "stats_table", racing)
+    size_tracking_lambda.update_stats(BUCKET, 9000, 900, backoff_s=0)
+    assert racing.puts == 4
+    item = stats_item(stats_table)
+    assert item["version"] == 5
+    assert item["last_ts"] == 9000
+
+def test_stale_listing_is_not_folded_in(stats_table):
+    size_tracking_lambda.update_stats(BUCKET, 5000, 100)
+    assert size_tracking_lambda.update_stats(BUCKET, 4000, 999) == (False, None)
+    assert size_tracking_lambda.update_stats(BUCKET, 5000, 999) == (False, None)
+    item = stats_item(stats_table)
+    assert item["version"] == 1
+    assert item["last_size"] == 100
+
+def test_reraises_after_last_attempt(stats_table, monkeypatch):
+    size_tracking_lambda.update_stats(BUCKET, 1000, 19)
+    racing = RacingStatsTable(stats_table, races=10)
+    monkeypatch.setattr(size_tracking_lambda, "stats_table", racing)
+    with pytest.raises(size_tracking_lambda.botocore.exceptions.ClientError) as exc:
+        size_tracking_lambda.update_stats(BUCKET, 9000, 900, attempts=3, backoff_s=0)
+    assert exc.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+    assert racing.puts == 3
@@ -0,0 +1,189 @@
+import gzip
+import os
+from array import array
+from collections import OrderedDict
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import snapshot
+
+# --- Fixtures ---
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep decompressed snapshots out of the real /tmp cache."""
+    monkeypatch.setattr(snapshot, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(snapshot, "_open", OrderedDict())
+
+def write(path, bucket, rows):
+    """rows: list of (ts ms, size, anomaly)."""
+    ts = array("q", [r[0] for r in rows])
+    size = array("q", [r[1] for r in rows])
+    objects = array("q", [1] * len(rows))
+    anomaly = array("B", [r[2] for r in rows])
+    with open(path, "wb") as f:
+        snapshot.write_snapshot(f, bucket, ts, size, objects, anomaly)
+    return str(path)
+
+ROWS = [(1000, 19, 0), (2000, 28, 0), (3000, 0, 1), (4000, 2, 0)]
+
+# --- Snapshot round-trip ---
+
+def test_round_trip(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "testbucket", ROWS)
+    snap = snapshot.open_snapshot(path)
+    assert snap.bucket == "testbucket"
+    assert list(snap.ts) == [1000, 2000, 3000, 4000]
+    assert list(snap.size) == [19, 28, 0, 2]
+    assert list(snap.high) == [19, 28, 28, 28]
+    assert list(snap.anomaly) == [0, 0, 1, 0]
+
+def test_window_bounds_are_inclusive(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "testbucket", ROWS)
+    xs, ys, flags, max_size, bucket = snapshot.load_window(path, 2, 3)
+    assert xs == [2.0, 3.0]
+    assert ys == [28.0, 0.0]
+    assert flags == [False, True]
+    assert max_size == 28.0
+    assert bucket == "testbucket"
+
+def test_window_high_is_as_of_window_end(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "b", ROWS)
+    assert snapshot.load_window(path, 0, 1)[3] == 19.0
+    # before the first row there is no history yet
+    assert snapshot.load_window(path, 0, 0.5) == ([], [], [], 0.0, "b")
+
+def test_default_window_is_last_10s(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "b", [(1000, 1, 0), (20000, 5, 0), (25000, 7, 0)])
+    xs, ys, _, max_size, _ = snapshot.load_window(path)
+    assert xs == [20.0, 25.0]
+    assert max_size == 7.0
+
+def test_empty_snapshot(tmp_path):
+    path = write(tmp_path / "empty.snap.gz", "b", [])
+    assert len(snapshot.open_snapshot(path)) == 0
+    assert snapshot.load_window(path) == ([], [], [], 0.0, "b")
+    assert snapshot.load_window(path, 0, 100) == ([], [], [], 0.0, "b")
+
+def test_rewritten_local_snapshot_is_reloaded(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "b", ROWS[:2])
+    assert len(snapshot.open_snapshot(path)) == 2
+    write(tmp_path / "h.snap.gz", "b", ROWS)
+    assert len(snapshot.open_snapshot(path)) == 4
+
+def cached_files():
+    return sorted(f for f in os.listdir(snapshot.CACHE_DIR) if f.endswith(".snap"))
+
+def test_rewritten_snapshot_evicts_old_copy(tmp_path):
+    path = write(tmp_path / "h.snap.gz", "b", ROWS[:2])
+    old = snapshot.open_snapshot(path)
+    old_files = cached_files()
+    write(tmp_path / "h.snap.gz", "b", ROWS)
+    snapshot.open_snapshot(path)
+    assert len(cached_files()) == 1
+    assert cached_files() != old_files
+    assert len(snapshot._open) == 1
+    with pytest.raises(ValueError):
+        old._mm[0]  # closed
+
+def test_cache_cap_evicts_least_recently_used(tmp_path, monkeypatch):
+    paths = [write(tmp_path / f"{i}.snap.gz", "b", ROWS) for i in range(3)]
+    one_file = None
+    for path in paths[:2]:
+        snapshot.open_snapshot(path)
+        one_file = one_file or os.path.getsize(os.path.join(snapshot.CACHE_DIR, cached_files()[0]))
+    monkeypatch.setattr(snapshot, "CACHE_MAX_BYTES", 2 * one_file)
+    snapshot.open_snapshot(paths[0])  # touch: paths[1] is now least recent
+    snapshot.open_snapshot(paths[2])
+    assert list(snapshot._open) == [paths[0], paths[2]]
+    assert len(cached_files()) == 2
+
+def test_rejects_non_snapshot(tmp_path):
+    path = tmp_path / "junk.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(b"\0" * 64)
+    with pytest.raises(ValueError):
+        snapshot.open_snapshot(str(path))
+
+# --- collect_history against DynamoDB ---
+
+@pytest.fixture(scope="function")
+def aws_credentials(monkeypatch):
+    """Mocked AWS Credentials for moto."""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+@pytest.fixture(scope="function")
+def history_table(aws_credentials):
+    with mock_aws():
+        ddb = boto3.resource("dynamodb", region_name="us-east-1")
+        ddb.create_table(
+            TableName=snapshot.TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "bucket_name", "KeyType": "HASH"},
+                {"AttributeName": "ts", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "bucket_name", "AttributeType": "S"},
+                {"AttributeName": "ts", "AttributeType": "N"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        table = ddb.Table(snapshot.TABLE_NAME)
+        # two buckets interleaved; only "tracked" should be exported
+        for i in range(40):
+            table.put_item(Item={
+                "bucket_name": "tracked" if i % 2 else "other",
+                "ts": 1000 * i, "size": 10 * i, "object_count": i,
+                "anomaly": i == 21, "stats": {"n": i},
+            })
+        yield table
+
+TRACKED_TS = [1000 * i for i in range(1, 40, 2)]
+
+def test_collect_history_query(history_table):
+    ts, size, objects, anomaly = snapshot.collect_history(snapshot.new_table, "tracked")
+    assert list(ts) == TRACKED_TS
+    assert list(size) == [t // 100 for t in TRACKED_TS]
+    assert list(anomaly) == [1 if t == 21000 else 0 for t in TRACKED_TS]
+
+@pytest.mark.parametrize("segments", [2, 4, 7])
+def test_collect_history_parallel_scan_merges_in_ts_order(history_table, segments):
+    made = []
+    def make_table():
+        table = snapshot.new_table()
+        made.append(table)
+        return table
+    ts, size, objects, anomaly = snapshot.collect_history(make_table, "tracked", segments)
+    assert list(ts) == TRACKED_TS
+    assert list(objects) == [t // 1000 for t in TRACKED_TS]
+    # one Table (own session) per worker
+    assert len(made) == segments
+    assert len({id(t) for t in made}) == segments
+
+class FakeSegmentTable:
+    """Segment i returns its rows newest first, to exercise the merge sort."""
+
+    def __init__(self, fail_segment=None):
+        self.fail_segment = fail_segment
+
+    def scan(self, Segment, TotalSegments, **kwargs):
+        if Segment == self.fail_segment:
+            raise RuntimeError("throttled")
+        rows = [{"ts": t, "size": t, "anomaly": False}
+                for t in range(Segment, 30, TotalSegments)]
+        return {"Items": list(reversed(rows))}
+
+def test_collect_history_sorts_unordered_segments():
+    ts, size, _, _ = snapshot.collect_history(FakeSegmentTable, "b", 3)
+    assert list(ts) == list(range(30))
+    assert list(size) == list(range(30))
+
+def test_collect_history_raises_when_a_segment_fails():
+    with pytest.raises(RuntimeError, match="1 scan segment") as exc:
+        snapshot.collect_history(lambda: FakeSegmentTable(fail_segment=1), "b", 3)
+    assert str(exc.value.__cause__) == "throttled"